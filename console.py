@@ -0,0 +1,52 @@
+import os
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class Color:
+    red = "\033[91m"
+    green = "\033[92m"
+    yellow = "\033[93m"
+    cyan = "\033[96m"
+    reset = "\033[0m"
+
+
+BANNER = r'''
+ _____  __  __ _____  _____  __  __  
+|  __ \|  \/  |  __ \|  __ \|  \/  | 
+| |__) | \  / | |  | | |__) | \  / | 
+|  _  /| |\/| | |  | |  _  /| |\/| | 
+| | \ \| |  | | |__| | | \ \| |  | | 
+|_|  \_\_|  |_|_____/|_|  \_\_|  |_| 
+'''
+
+
+def enable_ansi():
+    """
+    Add support for displaying colors
+    Only needed on a Windows console, so ctypes is imported here instead of at startup
+    """
+    if os.name != "nt" or not sys.stdout.isatty():
+        return
+    from ctypes import windll, byref
+    from ctypes.wintypes import DWORD
+
+    kernel32 = windll.kernel32
+    kernel32.GetConsoleMode.restype = DWORD
+    kernel32.SetConsoleMode.argtypes = (DWORD, DWORD)
+
+    # Get current console mode
+    hStdout = kernel32.GetStdHandle(-11)
+    mode = DWORD()
+    kernel32.GetConsoleMode(hStdout, byref(mode))
+
+    # Enable virtual terminal processing
+    kernel32.SetConsoleMode(hStdout, mode.value | 0x0004)
+
+
+def print_banner(subtitle):
+    """
+    Display banner
+    """
+    print(f"{BANNER}\n   {subtitle}\n")
@@ -0,0 +1,161 @@
+import os
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import Counter, defaultdict
+
+from engine import copy_with_time, is_text_file, rewrite_references
+from messages import msg
+
+HEADINGS = {f"h{num}" for num in range(1, 7)}
+
+# Lowest score an automatically accepted candidate may have
+AUTO_SCORE = 0.6
+
+# Score factor of candidates whose suffix differs from the reference
+CROSS_SUFFIX_PENALTY = 0.5
+
+
+def ngrams(text, n=2):
+    """
+    Character n-grams of a name, bigrams work for both CJK and latin names
+    """
+    text = f" {text.lower()} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def split_suffix(name):
+    """
+    Split a file name into stem and lower case suffix
+    """
+    stem, suffix = os.path.splitext(name)
+    return stem, suffix[1:].lower()
+
+
+class CorrectionIndex:
+    """
+    Index of the files of one book for references self_check could not resolve
+    Built once per book: decoded original names, new names and chapter headings,
+    bucketed by suffix with a bigram inverted index, so a lookup only scores
+    names that share at least one bigram instead of every file
+    """
+
+    def __init__(self):
+        self.targets = []  # Key id -> file name in the archive
+        self.key_grams = []  # Key id -> bigrams of the key
+        self.buckets = defaultdict(lambda: defaultdict(set))  # Suffix -> bigram -> key ids
+
+    def add(self, target, text):
+        """
+        Index text as a name of target
+        """
+        grams = ngrams(text)
+        key = len(self.targets)
+        self.targets.append(target)
+        self.key_grams.append(grams)
+        bucket = self.buckets[split_suffix(target)[1]]
+        for gram in grams:
+            bucket[gram].add(key)
+
+    @classmethod
+    def build(cls, zip_path, items):
+        """
+        Index the archive, items is the mapping from parse_xhtml
+        """
+        index = cls()
+        for href, new_name in items.items():
+            index.add(new_name, split_suffix(urllib.parse.unquote(os.path.basename(href)))[0])
+        with zipfile.ZipFile(zip_path, "r") as z:
+            for item in z.infolist():
+                name = os.path.basename(item.filename)
+                if not name:
+                    continue
+                index.add(name, split_suffix(name)[0])
+                if split_suffix(name)[1] in ("xhtml", "html"):
+                    for heading in chapter_headings(z, item):
+                        index.add(name, heading)
+        return index
+
+    def propose(self, token, limit=5):
+        """
+        Ranked (file name, score) candidates for an unresolved reference token
+        Score is the Dice coefficient of the bigrams, best key per file,
+        scaled down for files of another suffix when the suffix has no bucket
+        """
+        stem, suffix = split_suffix(urllib.parse.unquote(token))
+        grams = ngrams(stem)
+        buckets = [self.buckets[suffix]] if suffix in self.buckets else self.buckets.values()
+        shared = Counter()
+        for bucket in buckets:
+            for gram in grams:
+                shared.update(bucket.get(gram, ()))
+        best = {}
+        for key, common in shared.items():
+            score = 2 * common / (len(grams) + len(self.key_grams[key]))
+            target = self.targets[key]
+            if split_suffix(target)[1] != suffix:
+                score *= CROSS_SUFFIX_PENALTY
+            if score > best.get(target, 0):
+                best[target] = score
+        return sorted(best.items(), key=lambda c: (-c[1], c[0]))[:limit]
+
+
+def chapter_headings(zip_file, item):
+    """
+    Text of the h1 to h6 headings of a chapter
+    """
+    try:
+        root = ET.fromstring(zip_file.read(item.filename))
+    except ET.ParseError:
+        return []
+    headings = []
+    for element in root.iter():
+        if isinstance(element.tag, str) and element.tag.split("}")[-1] in HEADINGS:
+            text = "".join(element.itertext()).strip()
+            if text:
+                headings.append(text)
+    return headings
+
+
+def apply_corrections(src, dst, fixes):
+    """
+    Rewrite all accepted fixes {token: file name} in one pass over the archive
+    """
+    with zipfile.ZipFile(src, "r") as original_zip:
+        with zipfile.ZipFile(dst, "w") as new_zip:
+            for item in original_zip.infolist():
+                if item.filename[:5] == "OEBPS" and is_text_file(original_zip, item):
+                    rewrite_references(original_zip, item, new_zip, fixes)
+                else:
+                    copy_with_time(item.filename, item.date_time, new_zip, original_zip.read(item.filename))
+
+
+def correct_references(items, unresolved, src, dst, ask=False):
+    """
+    Semi-automatic correction of the references self_check could not resolve
+    With ask the user picks among the candidates, otherwise the best one is
+    accepted if its score reaches AUTO_SCORE and its suffix is the same as the
+    reference's. Returns the number of fixes
+    """
+    print(msg("correct_start"))
+    index = CorrectionIndex.build(src, items)
+    refs = Counter(token for tokens in unresolved.values() for token in tokens)
+    fixes = {}
+    for token, count in refs.items():
+        candidates = index.propose(token)
+        if not candidates:
+            continue
+        print(msg("correct_ref", token=urllib.parse.unquote(token), count=count))
+        for i, (target, score) in enumerate(candidates, 1):
+            print(msg("correct_candidate", num=i, target=target, score=score))
+        if ask:
+            choice = input(msg("correct_prompt")).strip()
+            if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+                fixes[token] = candidates[int(choice) - 1][0]
+        elif candidates[0][1] >= AUTO_SCORE and split_suffix(candidates[0][0])[1] == split_suffix(urllib.parse.unquote(token))[1]:
+            fixes[token] = candidates[0][0]
+            print(msg("correct_auto", target=candidates[0][0]))
+    if fixes:
+        apply_corrections(src, dst, fixes)
+    print(msg("correct_done", count=len(fixes)))
+    return len(fixes)
@@ -0,0 +1,487 @@
+import codecs
+import hashlib
+import os
+import re
+import shutil
+import string
+import tempfile
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+
+import metrics
+import progress
+from messages import msg, ref_kind
+
+# Percent-encoded (obfuscated) file names, e.g. %E3%81%82.xhtml
+QUOTE_PATTERN = re.compile(r'(?:%[0-9A-Fa-f]{2})+(?:\.[A-Za-z0-9]+)?')
+
+# Characters a reference token can be made of, streamed text is only cut outside them
+TOKEN_CHARS = "%." + string.ascii_letters + string.digits
+
+# Bytes read per chunk when streaming text members
+CHUNK_SIZE = 1 << 20
+
+# Already compressed formats, stored as is by the deterministic writer
+STORED_SUFFIXES = {"png", "jpg", "jpeg", "gif", "webp", "woff", "woff2"}
+
+# Manifest attributes naming other items, a duplicate and its kept copy must not disagree on them
+LINK_ATTRIBUTES = ("fallback", "media-overlay")
+
+# Binary resources that may be stored once when their content is identical
+DEDUP_SUFFIXES = {"png", "jpg", "jpeg", "gif", "webp", "ttf", "otf", "woff", "woff2"}
+
+
+def copy_with_time(filename, date_time, new_zip, file_content, encode=""):
+    """
+    Copy zip with specified time
+    """
+    new_info = zipfile.ZipInfo(filename)
+    new_info.date_time = date_time
+    if encode:
+        new_zip.writestr(new_info, file_content.encode(encode))
+    else:
+        new_zip.writestr(new_info, file_content)
+
+
+def open_with_time(filename, date_time, new_zip, size=0):
+    """
+    Open a member for streaming writes with specified time
+    size is only a hint, it decides whether ZIP64 headers are needed like writestr does
+    """
+    new_info = zipfile.ZipInfo(filename)
+    new_info.date_time = date_time
+    new_info.file_size = size
+    return new_zip.open(new_info, "w")
+
+
+def write_deterministic(src, dst):
+    """
+    Write the archive in a fixed layout, so identical content gives identical bytes
+    mimetype first and stored, the rest sorted by name, original timestamps,
+    normalized attributes, no extra fields, and one compression setting per suffix
+    """
+    with zipfile.ZipFile(src, "r") as original_zip:
+        infos = sorted(original_zip.infolist(), key=lambda i: (i.filename != "mimetype", i.filename))
+        with zipfile.ZipFile(dst, "w") as new_zip:
+            for item in infos:
+                new_info = zipfile.ZipInfo(item.filename, item.date_time)
+                new_info.create_system = 3  # Not the platform default, which differs between Windows and others
+                new_info.create_version = new_info.extract_version = 20
+                new_info.external_attr = 0o644 << 16
+                if item.filename == "mimetype" or item.filename.rsplit(".", 1)[-1].lower() in STORED_SUFFIXES:
+                    new_info.compress_type = zipfile.ZIP_STORED
+                else:
+                    new_info.compress_type = zipfile.ZIP_DEFLATED
+                new_zip.writestr(new_info, original_zip.read(item.filename), compresslevel=6)
+
+
+def iter_text_chunks(zip_file, filename, chunk_size=CHUNK_SIZE):
+    """
+    Decode a member as UTF-8 in chunks that never split a reference token
+    Each chunk ends with a character outside TOKEN_CHARS, the rest is carried to the next one.
+    Memory is bounded by the chunk size plus the longest run of TOKEN_CHARS, which can be
+    longer than any token (e.g. a long word or base64 data), such a run is carried whole
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    carry = ""
+    with zip_file.open(filename) as f:
+        while True:
+            raw = f.read(chunk_size)
+            text = carry + decoder.decode(raw, final=not raw)
+            if not raw:
+                if text:
+                    yield text
+                return
+            cut = len(text.rstrip(TOKEN_CHARS))
+            carry = text[cut:]
+            if cut:
+                yield text[:cut]
+
+
+@metrics.timed
+def parse_xhtml(cache):
+    """
+    Build mapping
+    """
+    print(msg("parse_start"))
+    items = {}
+    with zipfile.ZipFile(os.path.join(cache, "input.zip"), "r") as z:
+        with z.open("OEBPS/content.opf") as f:
+            content = f.read()
+            root = ET.fromstring(content)
+            namespaces = {"ns": root.tag.split("}")[0].strip("{")} if "}" in root.tag else {}
+            for item in root.findall(".//ns:item", namespaces):
+                if "%" in item.get("href"):
+                    item_id = item.get("id")
+                    item_href = f"OEBPS/{item.get('href')}"
+                    if item_id != "toc" and os.path.splitext(item_id)[1] == "":  # Complete filename, 'toc' is to avoid case-insensitive software issues
+                        item_id = item_id + os.path.splitext(os.path.basename(item_href))[1]
+                    items[item_href] = item_id
+    print(msg("parse_done"))
+    return items
+
+
+def manifest_items(zip_file):
+    """
+    Manifest items of the OPF, {file name in the archive: (OEBPS/ + href as written, attributes)}
+    """
+    with zip_file.open("OEBPS/content.opf") as f:
+        root = ET.fromstring(f.read())
+    namespaces = {"ns": root.tag.split("}")[0].strip("{")} if "}" in root.tag else {}
+    manifest = {}
+    for item in root.findall(".//ns:item", namespaces):
+        href = f"OEBPS/{item.get('href')}"
+        manifest[urllib.parse.unquote(href)] = (href, item.attrib)
+    return manifest
+
+
+def mergeable_items(dup, kept):
+    """
+    Whether a duplicate's manifest item can be folded into the kept one
+    Both need an item with an id, and they must not link to different items
+    """
+    if dup is None or kept is None or not dup[1].get("id") or not kept[1].get("id"):
+        return False
+    return all(not (dup[1].get(name) and kept[1].get(name) and dup[1][name] != kept[1][name]) for name in LINK_ATTRIBUTES)
+
+
+@metrics.timed
+def rename_files_in_zip(items, cache, dedup=False):
+    """
+    Rename files
+    With dedup, identical resources in the same directory are stored once,
+    returns {duplicate href: kept href}, both OEBPS/ + the href in the manifest like the keys of items
+    """
+    print(msg("rename_start"))
+    name_set = {urllib.parse.unquote(item) for item in items.keys()}
+    duplicates = {}
+    digests = {}
+    saved = 0
+    with zipfile.ZipFile(os.path.join(cache, "input.zip"), "r") as original_zip:
+        manifest = manifest_items(original_zip) if dedup else {}
+        with zipfile.ZipFile(os.path.join(cache, "output.zip"), "w") as new_zip:
+            for item in original_zip.infolist():
+                progress.advance(item.file_size)
+                file_data = original_zip.read(item.filename)
+                if dedup and item.filename.rsplit(".", 1)[-1].lower() in DEDUP_SUFFIXES:
+                    # Same directory only, references are rewritten by file name
+                    key = (os.path.dirname(item.filename), hashlib.sha256(file_data).digest())
+                    kept = digests.setdefault(key, item.filename)
+                    # Only obfuscated names have their references rewritten, and only manifest items can be merged
+                    if kept != item.filename and item.filename in name_set and mergeable_items(manifest.get(item.filename), manifest.get(kept)):
+                        duplicates[manifest[item.filename][0]] = manifest[kept][0]
+                        saved += item.file_size
+                        continue
+                if item.filename in name_set:
+                    dir_path = os.path.dirname(item.filename)
+                    new_filename = os.path.join(dir_path, items[urllib.parse.quote(item.filename)])
+                    copy_with_time(new_filename, item.date_time, new_zip, file_data)
+                else:
+                    copy_with_time(item.filename, item.date_time, new_zip, file_data)
+    progress.clear()
+    if dedup:
+        print(msg("dedup_done", count=len(duplicates), size=saved))
+    print(msg("rename_done"))
+    return duplicates
+
+
+def set_attribute(tag, name, value):
+    """
+    Set an attribute in the text of a start tag
+    """
+    if re.search(rf'\s{re.escape(name)}="', tag):
+        return re.sub(rf'(\s{re.escape(name)}=")[^"]*"', lambda m: f'{m[1]}{value}"', tag, count=1)
+    return re.sub(r'/?>$', lambda m: f' {name}="{value}"{m[0]}', tag, count=1)
+
+
+def drop_duplicate_items(opf, duplicates):
+    """
+    Remove manifest items of deduplicated resources from the OPF text
+    Their properties (cover-image, ...) and links are merged into the kept item,
+    other references to their id (spine, cover meta, fallback) point at the kept item
+    """
+    for dup, kept in duplicates.items():
+        # Manifest hrefs are relative to OEBPS
+        dup_item = re.search(rf'<item\b[^>]*\bhref="{re.escape(dup[6:])}"[^>]*>', opf)
+        kept_item = re.search(rf'<item\b[^>]*\bhref="{re.escape(kept[6:])}"[^>]*>', opf)
+        if not dup_item or not kept_item:
+            continue  # Keep the item rather than leave references to its id dangling
+        dup_attrs = dict(re.findall(r'\s([\w:-]+)="([^"]*)"', dup_item[0]))
+        kept_attrs = dict(re.findall(r'\s([\w:-]+)="([^"]*)"', kept_item[0]))
+        if "id" not in dup_attrs or "id" not in kept_attrs:
+            continue
+        merged = kept_item[0]
+        properties = kept_attrs.get("properties", "").split()
+        properties += [p for p in dup_attrs.get("properties", "").split() if p not in properties]
+        if properties:
+            merged = set_attribute(merged, "properties", " ".join(properties))
+        for name in LINK_ATTRIBUTES:
+            if name in dup_attrs and name not in kept_attrs:
+                merged = set_attribute(merged, name, dup_attrs[name])
+        opf = opf.replace(dup_item[0], "", 1).replace(kept_item[0], merged, 1)
+        opf = re.sub(rf'\b(idref|content|fallback)="{re.escape(dup_attrs["id"])}"', rf'\1="{kept_attrs["id"]}"', opf)
+    return opf
+
+
+def is_text_file(zipname, file):
+    """
+    Determine if a file is a text file
+    Directly read the file content as bytes and try to decode it as UTF-8
+    """
+    try:
+        with zipname.open(file) as f:
+            head = f.read(1024)  # Only the head is needed, large members are not read whole
+        raw_data = head[:38]  # This method may not be accurate enough, to improve accuracy, separately cut 38 and 1024
+        try:
+            raw_data.decode("utf-8")
+            return True
+        except UnicodeDecodeError:
+            try:
+                raw_data = head
+                raw_data.decode("utf-8")
+                return True
+            except UnicodeDecodeError:
+                return False
+    except IOError:
+        return False
+
+
+def rewrite_references(original_zip, item, new_zip, new_dic, chunk_size=CHUNK_SIZE):
+    """
+    Replace references in one text member, streamed in chunks to bound memory
+    The first pass collects the references like the whole-string version did,
+    the second replaces them in the same order, so the output is identical
+    """
+    chunks = iter_text_chunks(original_zip, item.filename, chunk_size)
+    if item.file_size <= chunk_size:
+        chunks = list(chunks)  # Small members are decoded only once
+    replace = {}
+    for chunk in chunks:
+        for match in QUOTE_PATTERN.findall(chunk):
+            if match in new_dic:
+                replace.setdefault(match, new_dic[match])
+    if not isinstance(chunks, list):
+        chunks = iter_text_chunks(original_zip, item.filename, chunk_size)
+    with open_with_time(item.filename, item.date_time, new_zip, item.file_size) as dest:
+        for chunk in chunks:
+            for match, new_name in replace.items():
+                chunk = chunk.replace(match, new_name)
+            dest.write(chunk.encode("utf-8"))
+
+
+@metrics.timed
+def check_file_quote(items, cache, duplicates=None, images=None):
+    """
+    Modify internal file references
+    References to deduplicated resources are pointed at the kept copy,
+    images maps file names to futures of their optimized data
+    """
+    print(msg("quote_start"))
+    new_dic = {os.path.basename(k): items[k] for k in items.keys()}
+    for dup, kept in (duplicates or {}).items():
+        new_dic[os.path.basename(dup)] = items.get(kept, urllib.parse.unquote(os.path.basename(kept)))
+    with zipfile.ZipFile(os.path.join(cache, "output.zip"), "r") as original_zip:
+        with zipfile.ZipFile(os.path.join(cache, "output2.zip"), "w") as new_zip:
+            for item in original_zip.infolist():
+                progress.advance(item.file_size)
+                if item.filename[:5] == "OEBPS" and is_text_file(original_zip, item):  # Only files under OEBPS directory are content-related
+                    if duplicates and item.filename == "OEBPS/content.opf":  # Manifest items are removed on the whole text
+                        file_content = drop_duplicate_items(original_zip.read(item.filename).decode("utf-8"), duplicates)
+                        for match in QUOTE_PATTERN.findall(file_content):
+                            if match in new_dic:
+                                file_content = file_content.replace(match, new_dic[match])
+                        copy_with_time(item.filename, item.date_time, new_zip, file_content, encode="utf-8")
+                    else:
+                        rewrite_references(original_zip, item, new_zip, new_dic)
+                elif images and item.filename in images:
+                    copy_with_time(item.filename, item.date_time, new_zip, images[item.filename].result())
+                else:
+                    copy_with_time(item.filename, item.date_time, new_zip, original_zip.read(item.filename))
+    progress.clear()
+    print(msg("quote_done"))
+
+
+@metrics.timed
+def remove_encryption(cache):
+    """
+    Remove encryption-related XML in META-INF
+    """
+    print(msg("encryption_start"))
+    with zipfile.ZipFile(os.path.join(cache, "output2.zip"), "r") as original_zip:
+        with zipfile.ZipFile(os.path.join(cache, "output3.zip"), "w") as new_zip:
+            for item in original_zip.infolist():
+                progress.advance(item.file_size)
+                if item.filename != "META-INF/encryption.xml":
+                    copy_with_time(item.filename, item.date_time, new_zip, original_zip.read(item.filename))
+    progress.clear()
+    print(msg("encryption_done"))
+
+
+@metrics.timed
+def check_toc(cache):
+    """
+    Fix potential TOC navigation issues
+    """
+    print(msg("toc_start"))
+    with zipfile.ZipFile(os.path.join(cache, "output3.zip"), "r") as original_zip:
+        file_content = original_zip.read("OEBPS/Text/TOC.xhtml").decode("utf-8")
+        matches = QUOTE_PATTERN.findall(file_content)
+        if matches:
+            print(msg("toc_fix_start"))
+            toc_dic = {}
+            with original_zip.open("OEBPS/Text/TOC.xhtml") as f:
+                content = f.read()
+                root = ET.fromstring(content)
+                namespaces = {"ns": root.tag.split("}")[0].strip("{")} if "}" in root.tag else {}
+                # Traverse all <div> tags
+                for div in root.findall(".//ns:div", namespaces):
+                    a = div.find("ns:a", namespaces)
+                    p = a.find("ns:p", namespaces)
+                    match = re.search(QUOTE_PATTERN, a.get("href"))
+                    if match:
+                        toc_dic[match[0]] = p.text
+
+            pattern = r"chapter\d+.xhtml"  # Normally, standard naming starts with 'chapter'
+            real_file = {}
+            for item in original_zip.infolist():
+                match = re.search(pattern, item.filename)
+                if match:
+                    with original_zip.open(item.filename) as f:
+                        content = f.read()
+                        root = ET.fromstring(content)
+                        namespaces = {"ns": root.tag.split("}")[0].strip("{")} if "}" in root.tag else {}
+                        for num in range(1, 5):  # Since the heading level is unknown, try from h1 to h5
+                            for i in root.findall(f".//ns:h{num}", namespaces):
+                                real_file[i.text] = os.path.basename(item.filename)
+
+            with zipfile.ZipFile(os.path.join(cache, "output4.zip"), "w") as new_zip:
+                for item in original_zip.infolist():
+                    if item.filename == "OEBPS/Text/TOC.xhtml":
+                        for m in matches:
+                            file_content = file_content.replace(m, real_file[toc_dic[m]])
+                        copy_with_time(item.filename, item.date_time, new_zip, file_content, encode="utf-8")
+                    else:
+                        copy_with_time(item.filename, item.date_time, new_zip, original_zip.read(item.filename))
+            matches = QUOTE_PATTERN.findall(file_content)
+            if matches:
+                print(msg("toc_fix_failed"))
+            else:
+                print(msg("toc_fix_done"))
+        else:
+            print(msg("toc_ok"))
+            shutil.copyfile(os.path.join(cache, "output3.zip"), os.path.join(cache, "output4.zip"))
+        print(msg("toc_done"))
+        return
+
+
+@metrics.timed
+def self_check(cache):
+    """
+    Self-check if modifications are complete, there may be unmatched names
+    Returns {file name: unmatched references} for the semi-automatic correction
+    """
+    print(msg("check_start"))
+    unresolved = {}
+    with zipfile.ZipFile(os.path.join(cache, "output4.zip"), "r") as zip:
+        # Traverse all files in the original ZIP
+        for item in zip.infolist():
+            if item.filename[:5] == "OEBPS" and is_text_file(zip, item):
+                file_content = zip.read(item.filename).decode("utf-8")
+                matches = QUOTE_PATTERN.findall(file_content)
+                if matches:
+                    unresolved[item.filename] = matches
+                dic = {}
+                name = os.path.basename(item.filename)
+                for match in matches:
+                    suf = match.split(".")[1]
+                    if dic.get(suf):
+                        dic[suf] += 1
+                    else:
+                        dic[suf] = 1
+                for k in dic.keys():
+                    metrics.UNRESOLVED.inc(k, dic[k])
+                    print(msg("check_unmatched", name=name, count=dic[k], kind=k))
+                    print(msg("check_file_kind", name=name, desc=ref_kind(name.split('.')[1])))
+                    print(msg("check_ref_kind", desc=ref_kind(k)))
+    print(msg("check_done"))
+    return unresolved
+
+
+def convert(epub_path, output_dir=".", dedup=False, image_pool=None, correct=None, deterministic=False, verify=False):
+    """
+    Run the whole pipeline on one EPUB
+    With image_pool (a ProcessPoolExecutor) PNGs are optimized while text is rewritten,
+    correct is None, "auto" or "ask" for the semi-automatic correction,
+    deterministic writes byte-identical output for identical content,
+    verify checks the written EPUB and raises VerificationError if it is broken
+    Returns the path of the fixed EPUB, or None if no fake DRM was found
+    """
+    epub_name = os.path.basename(epub_path)
+    cache = tempfile.mkdtemp(prefix="rmdrm-")  # One cache per conversion, so parallel runs don't collide
+    progress.begin_book(epub_path, epub_name)
+    try:
+        new_epub_name = _convert(epub_path, epub_name, cache, output_dir, dedup, image_pool, correct, deterministic, verify)
+    except Exception:
+        metrics.BOOKS.inc("failed")
+        raise
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+        progress.end_book()
+    if new_epub_name is None:
+        metrics.BOOKS.inc("skipped")
+    else:
+        metrics.BOOKS.inc("processed")
+        metrics.BYTES_IN.inc(amount=os.path.getsize(epub_path))
+        metrics.BYTES_OUT.inc(amount=os.path.getsize(new_epub_name))
+    return new_epub_name
+
+
+def _convert(epub_path, epub_name, cache, output_dir, dedup, image_pool, correct, deterministic, verify):
+    """
+    Stages of convert, run in its cache directory
+    """
+    shutil.copy2(epub_path, os.path.join(cache, "input.zip"))
+    items = parse_xhtml(cache)
+    if not items:
+        print(msg("no_encryption"))
+        return None
+    duplicates = rename_files_in_zip(items, cache, dedup)
+    images = None
+    if image_pool is not None:
+        from images import image_sizes, submit_pngs
+
+        start = time.perf_counter()
+        images = submit_pngs(image_pool, os.path.join(cache, "output.zip"))
+    check_file_quote(items, cache, duplicates, images)
+    if images is not None:
+        count, before, after = image_sizes(os.path.join(cache, "output.zip"), images)
+        print(msg("images_done", count=count, before=before, after=after, seconds=time.perf_counter() - start))
+    remove_encryption(cache)
+    check_toc(cache)
+    unresolved = self_check(cache)
+    final = os.path.join(cache, "output4.zip")
+    if correct and unresolved:
+        from correction import correct_references
+
+        if correct_references(items, unresolved, final, os.path.join(cache, "output5.zip"), ask=correct == "ask"):
+            final = os.path.join(cache, "output5.zip")
+    new_epub_name = os.path.join(output_dir, f"[fixed]{epub_name}")
+    if deterministic:
+        write_deterministic(final, new_epub_name)
+    else:
+        shutil.copy2(final, new_epub_name)
+    if verify:
+        from verify import VerificationError, verify_epub
+
+        print(msg("verify_start"))
+        try:
+            verify_epub(new_epub_name)
+        except VerificationError:
+            os.remove(new_epub_name)  # Do not leave a broken book behind
+            raise
+        print(msg("verify_done"))
+    stat = os.stat(epub_path)
+    os.utime(new_epub_name, (stat.st_atime, stat.st_mtime))
+    return new_epub_name
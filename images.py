@@ -0,0 +1,87 @@
+import struct
+import zipfile
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Ancillary chunks that change how pixels are displayed are kept, the rest (text, time, ...) is dropped
+KEEP_CHUNKS = {b"IHDR", b"PLTE", b"IDAT", b"IEND", b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT"}
+
+
+def iter_chunks(data):
+    """
+    Split PNG data into (type, body) chunks
+    """
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        pos += length + 12
+
+
+def make_chunk(chunk_type, body):
+    """
+    Build a chunk with its length and CRC
+    """
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+
+def optimize_png(data):
+    """
+    Losslessly shrink a PNG: re-deflate IDAT at the highest level and drop ancillary chunks
+    Returns the original data if it is not a PNG, is animated, or nothing was gained
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    try:
+        chunks = list(iter_chunks(data))
+    except struct.error:
+        return data
+    if any(t == b"acTL" for t, _ in chunks):  # APNG frames live outside IDAT
+        return data
+    try:
+        pixels = zlib.decompress(b"".join(b for t, b in chunks if t == b"IDAT"))
+    except zlib.error:
+        return data
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9)
+    idat = compressor.compress(pixels) + compressor.flush()
+    if zlib.decompress(idat) != pixels:  # Decoded image data must be bit-identical
+        return data
+    out = [PNG_SIGNATURE]
+    for chunk_type, body in chunks:
+        if chunk_type == b"IDAT":
+            if idat is not None:
+                out.append(make_chunk(b"IDAT", idat))
+                idat = None
+        elif chunk_type in KEEP_CHUNKS:
+            out.append(make_chunk(chunk_type, body))
+    new_data = b"".join(out)
+    return new_data if len(new_data) < len(data) else data
+
+
+def optimize_member(zip_path, filename):
+    """
+    Worker: read one PNG from the archive and optimize it
+    """
+    with zipfile.ZipFile(zip_path, "r") as z:
+        return optimize_png(z.read(filename))
+
+
+def submit_pngs(pool, zip_path):
+    """
+    Queue every PNG of the archive in the process pool
+    Returns {filename: future}, the futures run while text is being rewritten
+    """
+    with zipfile.ZipFile(zip_path, "r") as z:
+        names = [i.filename for i in z.infolist() if i.filename.lower().endswith(".png")]
+    return {name: pool.submit(optimize_member, zip_path, name) for name in names}
+
+
+def image_sizes(zip_path, futures):
+    """
+    Number of optimized PNGs and their total size before and after
+    """
+    with zipfile.ZipFile(zip_path, "r") as z:
+        before = sum(z.getinfo(name).file_size for name in futures)
+    after = sum(len(f.result()) for f in futures.values())
+    return len(futures), before, after
@@ -0,0 +1,86 @@
+import argparse
+import sys
+
+import messages
+from messages import LANGUAGES, msg
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Remove fake DRM encryption from EPUB ebooks")
+    parser.add_argument("epub", nargs="*", help="EPUB files to convert, prompt for one if omitted")
+    parser.add_argument("--lang", choices=LANGUAGES, default="en", help="message language")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for the fixed EPUBs")
+    parser.add_argument("--dedup", action="store_true", help="store identical images and fonts only once")
+    parser.add_argument("--optimize-images", action="store_true", help="losslessly recompress PNG images in worker processes")
+    parser.add_argument("--correct", action="store_true", help="propose fixes for unmatched references, ask on a terminal, otherwise accept confident ones")
+    parser.add_argument("--deterministic", action="store_true", help="byte-identical output for identical content")
+    parser.add_argument("--verify", action="store_true", help="check CRCs and structure of the written EPUB")
+    parser.add_argument("--progress", action="store_true", help="show progress, throughput and ETA (always on in interactive mode)")
+    parser.add_argument("--metrics-textfile", help="write metrics to this Prometheus textfile (*.prom)")
+    parser.add_argument("--metrics-json", help="write metrics to this JSON file")
+    parser.add_argument("--metrics-interval", type=float, default=15, help="seconds between metrics writes")
+    return parser, parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Main function
+    Interactive (banner, prompts) only when no EPUB is given on a terminal
+    """
+    parser, args = parse_args(argv)
+    messages.set_language(args.lang)
+    interactive = not args.epub
+    if interactive:
+        if not sys.stdin.isatty():
+            parser.error("no EPUB given and stdin is not a terminal")
+        from console import enable_ansi, print_banner
+
+        enable_ansi()
+        print_banner(msg("banner"))
+        args.epub = [input(msg("prompt_path"))]
+
+    import engine  # Imported late so argument errors stay cheap
+
+    image_pool = None
+    if args.optimize_images:
+        from concurrent.futures import ProcessPoolExecutor
+
+        image_pool = ProcessPoolExecutor()  # Shared by the whole batch
+    correct = None
+    if args.correct:
+        correct = "ask" if sys.stdin.isatty() else "auto"
+    writer = None
+    if args.metrics_textfile or args.metrics_json:
+        from metrics import MetricsWriter
+
+        writer = MetricsWriter(args.metrics_textfile, args.metrics_json, args.metrics_interval).start()
+    if args.progress or interactive:
+        import progress
+
+        progress.start(sum(progress.book_size(p) for p in args.epub))
+    status = 0
+    try:
+        for epub_path in args.epub:
+            try:
+                if engine.convert(epub_path, args.output_dir, dedup=args.dedup, image_pool=image_pool, correct=correct, deterministic=args.deterministic, verify=args.verify) is None:
+                    status = status or 1
+            except Exception as e:
+                print(msg("convert_failed", name=epub_path, error=e), file=sys.stderr)
+                status = 2
+    finally:
+        if image_pool is not None:
+            image_pool.shutdown()
+        if writer is not None:
+            writer.stop()
+        if args.progress or interactive:
+            progress.finish()
+    if interactive:
+        input(msg("done_exit") if status == 0 else msg("press_exit"))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import importlib
+
+from console import Color
+
+LANGUAGES = ("en", "ja", "zh")
+
+_catalog = None
+
+
+def set_language(lang):
+    """
+    Load the message catalog of one language
+    Only the selected catalog module is imported
+    """
+    global _catalog
+    if lang not in LANGUAGES:
+        raise ValueError(f"unsupported language: {lang}")
+    _catalog = importlib.import_module(f"{__name__}.{lang}")
+
+
+def catalog():
+    """
+    Current message catalog, English if no language was selected
+    """
+    if _catalog is None:
+        set_language("en")
+    return _catalog
+
+
+def msg(key, **kwargs):
+    """
+    Look up a message and fill in its placeholders, {c.xxx} are colors
+    """
+    return catalog().MESSAGES[key].format(c=Color, **kwargs)
+
+
+def ref_kind(suffix):
+    """
+    Describe the impact of an unmatched reference by file suffix
+    """
+    return catalog().REF_KINDS[suffix].format(c=Color)
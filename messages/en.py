@@ -0,0 +1,52 @@
+MESSAGES = {
+    "banner": "A tool to remove fake DRM encryption from EPUB ebooks",
+    "prompt_path": "Enter EPUB path or drag EPUB file to the window:",
+    "parse_start": "[{c.yellow}*{c.reset}] Starting file parsing",
+    "parse_done": "[{c.green}+{c.reset}] File parsing successful\n",
+    "rename_start": "[{c.yellow}*{c.reset}] Starting file renaming",
+    "dedup_done": "    Removed {c.yellow}{count}{c.reset} duplicate resources, saved {c.yellow}{size}{c.reset} bytes",
+    "rename_done": "[{c.green}+{c.reset}] Renaming successful\n",
+    "quote_start": "[{c.yellow}*{c.reset}] Starting to modify internal references",
+    "images_done": "    Optimized {c.yellow}{count}{c.reset} PNG images: {before} -> {after} bytes in {seconds:.2f}s",
+    "quote_done": "[{c.green}+{c.reset}] Modification successful\n",
+    "encryption_start": "[{c.yellow}*{c.reset}] Starting to remove encryption information",
+    "encryption_done": "[{c.green}+{c.reset}] Removal successful\n",
+    "toc_start": "[{c.yellow}*{c.reset}] Starting TOC self-check",
+    "toc_fix_start": "    Starting fix",
+    "toc_fix_failed": "[{c.red}-{c.reset}] Fix failed",
+    "toc_fix_done": "[{c.green}+{c.reset}] Fix completed",
+    "toc_ok": "    TOC is fine",
+    "toc_done": "[{c.green}+{c.reset}] TOC self-check completed\n",
+    "check_start": "[{c.yellow}*{c.reset}] Starting self-check\n",
+    "check_unmatched": "    In {c.yellow}{name}{c.reset}, there are {c.yellow}{count}{c.reset} references to {c.yellow}{kind}{c.reset} files that failed to match",
+    "check_file_kind": "    {name} is a {desc}",
+    "check_ref_kind": "    Unmatched references are {desc}\n",
+    "check_done": "[{c.green}+{c.reset}] Self-check completed\n",
+    "correct_start": "[{c.yellow}*{c.reset}] Starting semi-automatic correction",
+    "correct_ref": "    {c.yellow}{token}{c.reset} ({count} references) may be:",
+    "correct_candidate": "      [{num}] {target} ({score:.2f})",
+    "correct_prompt": "    Enter a number to accept, or press Enter to skip:",
+    "correct_auto": "    Accepted {c.green}{target}{c.reset}",
+    "correct_done": "[{c.green}+{c.reset}] Correction completed, {count} references fixed\n",
+    "verify_start": "[{c.yellow}*{c.reset}] Starting verification of the written EPUB",
+    "verify_done": "[{c.green}+{c.reset}] Verification successful\n",
+    "progress": "{percent:5.1f}% {done:.1f}/{total:.1f} MB, {rate:.1f} MB/s, ETA {eta} {name}",
+    "no_encryption": "[{c.red}-{c.reset}] Unable to identify encryption, possibly no fake DRM encryption",
+    "convert_failed": "[{c.red}-{c.reset}] Conversion of {name} failed: {error}",
+    "metrics_failed": "[{c.red}-{c.reset}] Unable to write metrics to {path}: {error}",
+    "press_exit": "Press any key to exit",
+    "done_exit": "Conversion completed, press any key to exit",
+}
+
+REF_KINDS = {
+    "css": "Style file, does not affect reading",
+    "xhtml": "{c.red}Content file, affects reading{c.reset}",
+    "opf": "{c.red}Metadata file, affects book opening{c.reset}",
+    "js": "JS code (mostly for annotations), does not affect reading",
+    "ncx": "{c.yellow}Related to TOC, does not affect reading, but may cause navigation issues{c.reset}",
+    "ttf": "Font file, does not affect reading",
+    "png": "{c.yellow}Image file, may cause some images to not display properly{c.reset}",
+    "jpg": "{c.yellow}Image file, may cause some images to not display properly{c.reset}",
+    "jpeg": "{c.yellow}Image file, may cause some images to not display properly{c.reset}",
+    "webp": "{c.yellow}Image file, may cause some images to not display properly{c.reset}",
+}
@@ -0,0 +1,52 @@
+MESSAGES = {
+    "banner": "EPUB電子書籍から偽のDRM暗号化を削除するツール",
+    "prompt_path": "EPUBのパスを入力するか、EPUBファイルをウィンドウにドラッグしてください:",
+    "parse_start": "[{c.yellow}*{c.reset}] ファイルの解析を開始します",
+    "parse_done": "[{c.green}+{c.reset}] ファイルの解析が成功しました\n",
+    "rename_start": "[{c.yellow}*{c.reset}] ファイル名の変更を開始します",
+    "dedup_done": "    重複したリソースを{c.yellow}{count}{c.reset}個削除し、{c.yellow}{size}{c.reset}バイト削減しました",
+    "rename_done": "[{c.green}+{c.reset}] ファイル名の変更が成功しました\n",
+    "quote_start": "[{c.yellow}*{c.reset}] 内部参照の修正を開始します",
+    "images_done": "    PNG画像を{c.yellow}{count}{c.reset}個最適化しました: {before} -> {after}バイト、{seconds:.2f}秒",
+    "quote_done": "[{c.green}+{c.reset}] 修正が成功しました\n",
+    "encryption_start": "[{c.yellow}*{c.reset}] 暗号化情報の削除を開始します",
+    "encryption_done": "[{c.green}+{c.reset}] 削除が成功しました\n",
+    "toc_start": "[{c.yellow}*{c.reset}] TOCの自己チェックを開始します",
+    "toc_fix_start": "    修正を開始します",
+    "toc_fix_failed": "[{c.red}-{c.reset}] 修正に失敗しました",
+    "toc_fix_done": "[{c.green}+{c.reset}] 修正が完了しました",
+    "toc_ok": "    TOCは正常です",
+    "toc_done": "[{c.green}+{c.reset}] TOCの自己チェックが完了しました\n",
+    "check_start": "[{c.yellow}*{c.reset}] 自己チェックを開始します\n",
+    "check_unmatched": "    {c.yellow}{name}{c.reset}内に、{c.yellow}{kind}{c.reset}ファイルへの{c.yellow}{count}{c.reset}個の参照がマッチしませんでした",
+    "check_file_kind": "    {name}は{desc}です",
+    "check_ref_kind": "    マッチしなかった参照は{desc}です\n",
+    "check_done": "[{c.green}+{c.reset}] 自己チェックが完了しました\n",
+    "correct_start": "[{c.yellow}*{c.reset}] 半自動修正を開始します",
+    "correct_ref": "    {c.yellow}{token}{c.reset}（{count}個の参照）の候補:",
+    "correct_candidate": "      [{num}] {target} ({score:.2f})",
+    "correct_prompt": "    番号を入力して採用、Enterでスキップ:",
+    "correct_auto": "    {c.green}{target}{c.reset}を採用しました",
+    "correct_done": "[{c.green}+{c.reset}] 修正が完了しました、{count}個の参照を修正しました\n",
+    "verify_start": "[{c.yellow}*{c.reset}] 書き出したEPUBの検証を開始します",
+    "verify_done": "[{c.green}+{c.reset}] 検証が成功しました\n",
+    "progress": "{percent:5.1f}% {done:.1f}/{total:.1f} MB、{rate:.1f} MB/s、残り {eta} {name}",
+    "no_encryption": "[{c.red}-{c.reset}] 暗号化を識別できませんでした、偽のDRM暗号化がない可能性があります",
+    "convert_failed": "[{c.red}-{c.reset}] {name}の変換に失敗しました: {error}",
+    "metrics_failed": "[{c.red}-{c.reset}] メトリクスを{path}に書き込めませんでした: {error}",
+    "press_exit": "任意のキーを押して終了します",
+    "done_exit": "変換が完了しました、任意のキーを押して終了します",
+}
+
+REF_KINDS = {
+    "css": "スタイルファイル、読み取りに影響しません",
+    "xhtml": "{c.red}コンテンツファイル、読み取りに影響します{c.reset}",
+    "opf": "{c.red}メタデータファイル、書籍の開封に影響します{c.reset}",
+    "js": "JSコード（ほとんどは注釈用）、読み取りに影響しません",
+    "ncx": "{c.yellow}TOC関連、読み取りに影響しませんが、ナビゲーションに問題を引き起こす可能性があります{c.reset}",
+    "ttf": "フォントファイル、読み取りに影響しません",
+    "png": "{c.yellow}画像ファイル、一部の画像が正しく表示されない可能性があります{c.reset}",
+    "jpg": "{c.yellow}画像ファイル、一部の画像が正しく表示されない可能性があります{c.reset}",
+    "jpeg": "{c.yellow}画像ファイル、一部の画像が正しく表示されない可能性があります{c.reset}",
+    "webp": "{c.yellow}画像ファイル、一部の画像が正しく表示されない可能性があります{c.reset}",
+}
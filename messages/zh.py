@@ -0,0 +1,52 @@
+MESSAGES = {
+    "banner": "去除一些伪DRM加密的EPUB电子书的工具",
+    "prompt_path": "输入EPUB路径或者直接拖动EPUB文件到窗口:",
+    "parse_start": "[{c.yellow}*{c.reset}] 开始解析文件",
+    "parse_done": "[{c.green}+{c.reset}] 解析文件成功\n",
+    "rename_start": "[{c.yellow}*{c.reset}] 开始处理文件名",
+    "dedup_done": "    删除了{c.yellow}{count}{c.reset}个重复资源，节省{c.yellow}{size}{c.reset}字节",
+    "rename_done": "[{c.green}+{c.reset}] 处理成功\n",
+    "quote_start": "[{c.yellow}*{c.reset}] 开始修改内部引用",
+    "images_done": "    优化了{c.yellow}{count}{c.reset}张PNG图片: {before} -> {after}字节，用时{seconds:.2f}秒",
+    "quote_done": "[{c.green}+{c.reset}] 修改成功\n",
+    "encryption_start": "[{c.yellow}*{c.reset}] 开始删除加密信息",
+    "encryption_done": "[{c.green}+{c.reset}] 处理成功\n",
+    "toc_start": "[{c.yellow}*{c.reset}] 开始自检目录",
+    "toc_fix_start": "    开始修复",
+    "toc_fix_failed": "[{c.red}-{c.reset}] 修复失败",
+    "toc_fix_done": "[{c.green}+{c.reset}] 修复完成",
+    "toc_ok": "    目录无问题",
+    "toc_done": "[{c.green}+{c.reset}] 目录自检结束\n",
+    "check_start": "[{c.yellow}*{c.reset}] 开始自检\n",
+    "check_unmatched": "    在{c.yellow}{name}{c.reset}中有{c.yellow}{count}{c.reset}项引用的{c.yellow}{kind}{c.reset}文件未匹配成功",
+    "check_file_kind": "    {name}为{desc}",
+    "check_ref_kind": "    未能匹配到的引用的文件为{desc}\n",
+    "check_done": "[{c.green}+{c.reset}] 自检完成\n",
+    "correct_start": "[{c.yellow}*{c.reset}] 开始半自动修正",
+    "correct_ref": "    {c.yellow}{token}{c.reset}（{count}处引用）可能是:",
+    "correct_candidate": "      [{num}] {target} ({score:.2f})",
+    "correct_prompt": "    输入序号采用，直接回车跳过:",
+    "correct_auto": "    已采用{c.green}{target}{c.reset}",
+    "correct_done": "[{c.green}+{c.reset}] 修正完成，修复了{count}项引用\n",
+    "verify_start": "[{c.yellow}*{c.reset}] 开始校验生成的EPUB",
+    "verify_done": "[{c.green}+{c.reset}] 校验成功\n",
+    "progress": "{percent:5.1f}% {done:.1f}/{total:.1f} MB，{rate:.1f} MB/s，剩余 {eta} {name}",
+    "no_encryption": "[{c.red}-{c.reset}] 无法识别加密信息，可能不存在伪DRM加密",
+    "convert_failed": "[{c.red}-{c.reset}] {name}转换失败: {error}",
+    "metrics_failed": "[{c.red}-{c.reset}] 无法将指标写入{path}: {error}",
+    "press_exit": "按任意键退出",
+    "done_exit": "转换完成，按任意键退出",
+}
+
+REF_KINDS = {
+    "css": "样式文件，不影响阅读",
+    "xhtml": "{c.red}书籍内容文件，会影响阅读{c.reset}",
+    "opf": "{c.red}书籍属性相关文件，影响书籍打开{c.reset}",
+    "js": "js代码(多用于注解)，不影响阅读",
+    "ncx": "{c.yellow}与目录相关，不影响阅读，但可能导致目录无法正确跳转{c.reset}",
+    "ttf": "字体文件，不影响阅读",
+    "png": "{c.yellow}图片文件，会导致部分图片无法正常显示{c.reset}",
+    "jpg": "{c.yellow}图片文件，会导致部分图片无法正常显示{c.reset}",
+    "jpeg": "{c.yellow}图片文件，会导致部分图片无法正常显示{c.reset}",
+    "webp": "{c.yellow}图片文件，会导致部分图片无法正常显示{c.reset}",
+}
@@ -0,0 +1,180 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from messages import msg
+
+_lock = threading.Lock()
+_registry = []
+
+# Upper bounds in seconds of the stage latency histogram
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+
+class Counter:
+    """
+    Counter with at most one label
+    """
+    kind = "counter"
+
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, label_value=None, amount=1):
+        with _lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def samples(self):
+        """
+        (name suffix, labels, value) for the exposition format
+        """
+        for label_value, value in sorted(self.values.items(), key=lambda v: str(v[0])):
+            yield "", _labels(self.label, label_value), value
+
+    def snapshot(self):
+        return {str(k) if k is not None else "": v for k, v in self.values.items()}
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets and at most one label
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help, label=None, buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = buckets
+        self.values = {}  # Label value -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, label_value, value):
+        with _lock:
+            data = self.values.setdefault(label_value, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def samples(self):
+        for label_value, data in sorted(self.values.items(), key=lambda v: str(v[0])):
+            labels = _labels(self.label, label_value)
+            for bound, count in zip(self.buckets, data):
+                yield "_bucket", {**labels, "le": str(bound)}, count
+            yield "_bucket", {**labels, "le": "+Inf"}, data[-1]
+            yield "_sum", labels, data[-2]
+            yield "_count", labels, data[-1]
+
+    def snapshot(self):
+        return {
+            str(k) if k is not None else "": {"buckets": dict(zip(map(str, self.buckets), data)), "sum": data[-2], "count": data[-1]}
+            for k, data in self.values.items()
+        }
+
+
+def _labels(label, label_value):
+    return {label: str(label_value)} if label else {}
+
+
+BOOKS = Counter("rmdrm_books_total", "Books handled, by outcome", "status")
+STAGE_SECONDS = Histogram("rmdrm_stage_seconds", "Latency of the pipeline stages", "stage")
+BYTES_IN = Counter("rmdrm_bytes_in_total", "Bytes of input EPUBs")
+BYTES_OUT = Counter("rmdrm_bytes_out_total", "Bytes of fixed EPUBs")
+UNRESOLVED = Counter("rmdrm_unresolved_references_total", "References self_check could not match, by file type", "type")
+
+
+def timed(func):
+    """
+    Record the latency of a stage under its function name
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STAGE_SECONDS.observe(func.__name__, time.perf_counter() - start)
+    return wrapper
+
+
+def prometheus_text():
+    """
+    All metrics in the Prometheus text exposition format
+    """
+    lines = []
+    with _lock:
+        for metric in _registry:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{metric.name}{suffix}{{{label_text}}} {value}" if label_text else f"{metric.name}{suffix} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def json_snapshot():
+    """
+    All metrics as a JSON document
+    """
+    with _lock:
+        data = {metric.name: {"type": metric.kind, "values": metric.snapshot()} for metric in _registry}
+    return json.dumps({"timestamp": time.time(), "metrics": data}, ensure_ascii=False, indent=2)
+
+
+def _write_atomic(path, text):
+    """
+    Write through a temporary file so readers never see a partial file
+    The node exporter only reads *.prom, so the temporary name is ignored
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class MetricsWriter:
+    """
+    Write the metrics periodically from a background thread, and once more on stop
+    Write errors are reported, never raised, so a bad sink cannot fail the batch
+    """
+
+    def __init__(self, textfile=None, json_path=None, interval=15):
+        self.textfile = textfile
+        self.json_path = json_path
+        self.interval = interval
+        self._errors = {}  # Path -> last reported error
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def write(self):
+        for path, render in ((self.textfile, prometheus_text), (self.json_path, json_snapshot)):
+            if not path:
+                continue
+            try:
+                _write_atomic(path, render())
+            except OSError as e:
+                if self._errors.get(path) != str(e):  # Report once, not on every interval
+                    self._errors[path] = str(e)
+                    print(msg("metrics_failed", path=path, error=e), file=sys.stderr)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.write()
@@ -0,0 +1,123 @@
+import sys
+import time
+import zipfile
+
+from messages import msg
+
+# The rename, reference rewrite and encryption removal loops each stream every member once
+PASSES = 3
+
+# Seconds between updates, a terminal line is redrawn often, a log line is printed rarely
+TTY_INTERVAL = 0.2
+LOG_INTERVAL = 10
+
+_active = None
+
+
+def book_size(epub_path):
+    """
+    Total uncompressed bytes of a book, from the zip central directory only
+    """
+    try:
+        with zipfile.ZipFile(epub_path, "r") as z:
+            return sum(item.file_size for item in z.infolist())
+    except (zipfile.BadZipFile, OSError):
+        return 0
+
+
+class Progress:
+    """
+    Byte-weighted progress of a batch, with throughput and ETA
+    """
+
+    def __init__(self, total, stream=None):
+        self.stream = stream or sys.stderr
+        self.total = total * PASSES
+        self.done = 0
+        self.book_end = 0
+        self.name = ""
+        self.tty = self.stream.isatty()
+        self.interval = TTY_INTERVAL if self.tty else LOG_INTERVAL
+        self.start = self.last = time.monotonic()
+
+    def begin_book(self, name, size):
+        self.name = name
+        self.book_end = self.done + size * PASSES
+
+    def end_book(self):
+        """
+        Skipped or failed books count as done, so the ETA stays right
+        """
+        self.advance(self.book_end - self.done)
+
+    def advance(self, size):
+        self.done += size
+        now = time.monotonic()
+        if now - self.last >= self.interval:  # Rate limited, this is called for every member
+            self.render(now)
+
+    def render(self, now):
+        self.last = now
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed else 0
+        eta = (self.total - self.done) / rate if rate else 0
+        line = msg(
+            "progress",
+            percent=min(100.0, self.done * 100 / self.total) if self.total else 100.0,
+            done=self.done / PASSES / 1e6,
+            total=self.total / PASSES / 1e6,
+            rate=rate / PASSES / 1e6,
+            eta=time.strftime("%H:%M:%S", time.gmtime(max(0, eta))),
+            name=self.name,
+        )
+        if self.tty:
+            self.stream.write(f"\r{line}\033[K")
+        else:
+            self.stream.write(f"{line}\n")
+        self.stream.flush()
+
+    def clear(self):
+        """
+        Erase the terminal line before a stage prints its messages
+        """
+        if self.tty:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+
+
+def start(total):
+    """
+    Report progress of a batch of total uncompressed bytes
+    """
+    global _active
+    _active = Progress(total)
+
+
+def finish():
+    global _active
+    if _active is not None:
+        if not _active.tty:
+            _active.render(time.monotonic())  # Final log line
+        _active.clear()
+    _active = None
+
+
+def begin_book(epub_path, name):
+    if _active is not None:
+        _active.begin_book(name, book_size(epub_path))
+
+
+def end_book():
+    if _active is not None:
+        _active.end_book()
+        _active.clear()
+
+
+def advance(size):
+    if _active is not None:
+        _active.advance(size)
+
+
+def clear():
+    if _active is not None:
+        _active.clear()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+import urllib.parse
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+
+IMAGE = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 4 + b"\xff\xd9"
+
+
+def make_epub(path, manifest_kept=True):
+    """
+    EPUB with two identical obfuscated JPEGs, the second one is the cover and in the spine
+    """
+    kept, dup = urllib.parse.quote("絵"), urllib.parse.quote("図")
+    chapter_name = urllib.parse.quote("第一章")
+    kept_item = f'<item id="img1" href="Images/{kept}.jpg" media-type="image/jpeg"/>' if manifest_kept else ""
+    opf = (
+        '<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf">'
+        '<metadata><meta name="cover" content="img2"/></metadata><manifest>'
+        f'<item id="chapter1" href="Text/{chapter_name}.xhtml" media-type="application/xhtml+xml"/>'
+        f'{kept_item}'
+        f'<item id="img2" href="Images/{dup}.jpg" media-type="image/jpeg" properties="cover-image"/>'
+        '<item id="toc" href="Text/TOC.xhtml" media-type="application/xhtml+xml"/>'
+        '</manifest><spine><itemref idref="img2" linear="no"/><itemref idref="chapter1"/></spine></package>'
+    )
+    chapter = (
+        '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"><body><h1>第一章</h1>'
+        f'<img src="../Images/{kept}.jpg"/><img src="../Images/{dup}.jpg"/></body></html>'
+    )
+    toc = '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"><body></body></html>'
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("mimetype", "application/epub+zip")
+        z.writestr("OEBPS/content.opf", opf)
+        z.writestr("OEBPS/Text/第一章.xhtml", chapter)
+        z.writestr("OEBPS/Images/絵.jpg", IMAGE)
+        z.writestr("OEBPS/Images/図.jpg", IMAGE)
+        z.writestr("OEBPS/Text/TOC.xhtml", toc)
+
+
+def convert(tmp, **kwargs):
+    epub = os.path.join(tmp, "book.epub")
+    make_epub(epub, **kwargs)
+    return zipfile.ZipFile(engine.convert(epub, tmp, dedup=True))
+
+
+class DedupTest(unittest.TestCase):
+    def test_duplicate_merged_into_kept_item(self):
+        with tempfile.TemporaryDirectory() as tmp, convert(tmp) as z:
+            self.assertIn("OEBPS/Images/img1.jpg", z.namelist())
+            self.assertNotIn("OEBPS/Images/img2.jpg", z.namelist())
+            opf = z.read("OEBPS/content.opf").decode("utf-8")
+            self.assertNotIn('id="img2"', opf)
+            self.assertIn('<item id="img1" href="Images/img1.jpg" media-type="image/jpeg" properties="cover-image"/>', opf)
+            self.assertIn('<meta name="cover" content="img1"/>', opf)
+            self.assertIn('<itemref idref="img1" linear="no"/>', opf)
+            chapter = z.read("OEBPS/Text/chapter1.xhtml").decode("utf-8")
+            self.assertEqual(chapter.count('src="../Images/img1.jpg"'), 2)
+
+    def test_kept_file_without_manifest_item_is_not_merged(self):
+        with tempfile.TemporaryDirectory() as tmp, convert(tmp, manifest_kept=False) as z:
+            self.assertIn("OEBPS/Images/img2.jpg", z.namelist())
+            opf = z.read("OEBPS/content.opf").decode("utf-8")
+            self.assertIn('<meta name="cover" content="img2"/>', opf)
+            self.assertIn('<itemref idref="img2" linear="no"/>', opf)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+import urllib.parse
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+
+
+def make_epub(path):
+    """
+    Tiny EPUB with one obfuscated chapter, mimetype deliberately not first
+    """
+    name = urllib.parse.quote("第一章")
+    opf = (
+        '<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf"><manifest>'
+        f'<item id="chapter1" href="Text/{name}.xhtml" media-type="application/xhtml+xml"/>'
+        '<item id="toc" href="Text/TOC.xhtml" media-type="application/xhtml+xml"/>'
+        '</manifest></package>'
+    )
+    toc = (
+        '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"><body>'
+        f'<div><a href="{name}.xhtml"><p>第一章</p></a></div></body></html>'
+    )
+    chapter = '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"><body><h1>第一章</h1></body></html>'
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(zipfile.ZipInfo("META-INF/container.xml", (2020, 1, 1, 0, 0, 0)), '<?xml version="1.0"?><container/>')
+        z.writestr(zipfile.ZipInfo("mimetype", (2020, 1, 1, 0, 0, 0)), "application/epub+zip")
+        z.writestr(zipfile.ZipInfo("META-INF/encryption.xml", (2020, 1, 1, 0, 0, 0)), "<encryption/>")
+        z.writestr(zipfile.ZipInfo("OEBPS/content.opf", (2020, 1, 1, 0, 0, 0)), opf)
+        z.writestr(zipfile.ZipInfo("OEBPS/Text/第一章.xhtml", (2020, 1, 2, 0, 0, 0)), chapter)
+        z.writestr(zipfile.ZipInfo("OEBPS/Text/TOC.xhtml", (2020, 1, 2, 0, 0, 0)), toc)
+
+
+class DeterministicTest(unittest.TestCase):
+    def test_identical_output_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            epub = os.path.join(tmp, "book.epub")
+            make_epub(epub)
+            outputs = []
+            for run in range(2):
+                output_dir = os.path.join(tmp, f"run{run}")
+                os.makedirs(output_dir)
+                if run:
+                    time.sleep(2.1)  # Zip timestamps have a 2 second resolution
+                outputs.append(engine.convert(epub, output_dir, deterministic=True))
+            with open(outputs[0], "rb") as a, open(outputs[1], "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            with zipfile.ZipFile(outputs[0]) as z:
+                first = z.infolist()[0]
+                self.assertEqual(first.filename, "mimetype")
+                self.assertEqual(first.compress_type, zipfile.ZIP_STORED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import os
+import random
+import sys
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+
+NEW_DIC = {
+    "%E3%81%82.xhtml": "chapter1.xhtml",
+    "%E3%81%82%E3%81%84.xhtml": "chapter2.xhtml",
+    "%E7%B5%B5.png": "img1.png",
+    "%E7%B5%B5%E7%B5%B5.png": "img2.png",
+    "%AB.css": "style.css",
+}
+PIECES = [
+    "%E3%81%82.xhtml", "%E3%81%82%E3%81%84.xhtml", "%E3%81%82%E3", "%E7%B5%B5.png",
+    "%E7%B5%B5%E7%B5%B5.png", "%AB.css", "%ab%CD", '<a href="', '">', " ", "日本語", "é", "\n", ".", "%", "x%4", "Z9",
+]
+
+
+def whole_string(text):
+    """
+    The reference rewrite on one string, as before streaming
+    """
+    for match in engine.QUOTE_PATTERN.findall(text):
+        if match in NEW_DIC:
+            text = text.replace(match, NEW_DIC[match])
+    return text
+
+
+def streamed(text, chunk_size):
+    source = io.BytesIO()
+    with zipfile.ZipFile(source, "w") as z:
+        z.writestr("OEBPS/Text/a.xhtml", text.encode("utf-8"))
+    target = io.BytesIO()
+    with zipfile.ZipFile(source) as z, zipfile.ZipFile(target, "w") as new_zip:
+        engine.rewrite_references(z, z.getinfo("OEBPS/Text/a.xhtml"), new_zip, NEW_DIC, chunk_size)
+    with zipfile.ZipFile(target) as z:
+        return z.read("OEBPS/Text/a.xhtml").decode("utf-8")
+
+
+class StreamingTest(unittest.TestCase):
+    def test_tokens_across_chunk_boundaries(self):
+        text = (
+            '<a href="%E3%81%82%E3%81%84.xhtml">日本</a><img src="%E7%B5%B5%E7%B5%B5.png"/>'
+            '%E3%81%82%E3 <img src="%E7%B5%B5.png"/><link href="%AB.css"/> %E3%81%82.xhtml'
+        )
+        for chunk_size in range(1, 40):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(streamed(text, chunk_size), whole_string(text))
+
+    def test_random_text_matches_whole_string(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            text = "".join(rnd.choice(PIECES) for _ in range(rnd.randint(0, 40)))
+            chunk_size = rnd.randint(1, 64)
+            with self.subTest(text=text, chunk_size=chunk_size):
+                self.assertEqual(streamed(text, chunk_size), whole_string(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import posixpath
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Bytes read at a time while checking CRCs, large enough for zlib to release the GIL
+READ_SIZE = 1 << 20
+
+
+class VerificationError(Exception):
+    """
+    The written EPUB is not readable or not a valid archive
+    """
+
+
+def check_crc(path, names):
+    """
+    Worker: read members to the end, ZipExtFile raises on a CRC mismatch
+    Each worker has its own handle so reads do not share a file position
+    """
+    problems = []
+    with zipfile.ZipFile(path, "r") as z:
+        for name in names:
+            try:
+                with z.open(name) as f:
+                    while f.read(READ_SIZE):
+                        pass
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, zlib.error, NotImplementedError, EOFError, OSError) as e:
+                problems.append(f"{name}: {e}")
+    return problems
+
+
+def opf_path(z):
+    """
+    Path of the OPF from container.xml, OEBPS/content.opf if it names none
+    """
+    try:
+        root = ET.fromstring(z.read("META-INF/container.xml"))
+        for element in root.iter():
+            if element.tag.split("}")[-1] == "rootfile" and element.get("full-path"):
+                return element.get("full-path")
+    except (KeyError, ET.ParseError, zipfile.BadZipFile, zlib.error, NotImplementedError, EOFError, OSError):
+        pass  # A damaged container.xml is reported by the CRC check
+    return "OEBPS/content.opf"
+
+
+def check_structure(z):
+    """
+    mimetype first and stored, OPF parses, every manifest href exists
+    """
+    problems = []
+    infos = z.infolist()
+    if not infos or infos[0].filename != "mimetype":
+        problems.append("mimetype is not the first member")
+    elif infos[0].compress_type != zipfile.ZIP_STORED:
+        problems.append("mimetype is compressed")
+    opf = opf_path(z)
+    try:
+        root = ET.fromstring(z.read(opf))
+    except KeyError:
+        return problems + [f"{opf} is missing"]
+    except (zipfile.BadZipFile, zlib.error, NotImplementedError, EOFError, OSError) as e:
+        return problems + [f"{opf} cannot be read: {e}"]
+    except ET.ParseError as e:
+        return problems + [f"{opf} does not parse: {e}"]
+    names = set(z.namelist())
+    base = posixpath.dirname(opf)
+    for element in root.iter():
+        if element.tag.split("}")[-1] != "item" or not element.get("href"):
+            continue
+        href = element.get("href")
+        if urllib.parse.urlsplit(href).scheme:  # Remote resources are not in the archive
+            continue
+        target = posixpath.normpath(posixpath.join(base, urllib.parse.unquote(href.split("#")[0])))
+        if target not in names:
+            problems.append(f"manifest item {href} is missing")
+    return problems
+
+
+def verify_epub(path, workers=None):
+    """
+    Check a written EPUB, raise VerificationError listing every problem
+    CRCs are checked in threads, zlib.crc32 and decompression release the GIL
+    """
+    try:
+        with zipfile.ZipFile(path, "r") as z:
+            problems = check_structure(z)
+            names = z.namelist()
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, zlib.error, NotImplementedError, EOFError, OSError) as e:
+        raise VerificationError(f"{path}: {e}") from e
+    workers = max(1, min(workers or os.cpu_count() or 1, len(names)))
+    with ThreadPoolExecutor(workers) as pool:
+        for result in pool.map(check_crc, [path] * workers, [names[i::workers] for i in range(workers)]):
+            problems.extend(result)
+    if problems:
+        raise VerificationError("; ".join(problems))